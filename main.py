@@ -1,22 +1,25 @@
 # main.py
-from dotenv import load_dotenv
+import asyncio
+import atexit
 import os
-import datetime
-import random
+import queue
+import time
+import secrets
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import contextlib
-from typing import Optional  # Import Optional for global variables
+from functools import lru_cache
+from typing import AsyncIterator, Optional  # Import Optional for global variables
 
 from fastapi import FastAPI, HTTPException, status, Body
+from fastapi.responses import ORJSONResponse, StreamingResponse
+import orjson
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 # Import the new classes
 from vault_client import VaultClient
 from s3_manager import S3Manager
 
-# Load environment variables from .env file
-load_dotenv(override=True)
-
 # --- Configure Logging ---
 current_script_dir: str = os.path.dirname(
     os.path.abspath(__file__))  # Added type hint
@@ -25,28 +28,59 @@ log_file_path: str = os.path.join(
 
 logger: logging.Logger = logging.getLogger(__name__)  # Added type hint
 logger.setLevel(logging.INFO)
+# Both handlers are attached directly; don't also bubble to the root logger.
+logger.propagate = False
 
 console_handler: logging.StreamHandler = logging.StreamHandler()  # Added type hint
 formatter: logging.Formatter = logging.Formatter(
     '%(asctime)s - %(name)s - %(levelname)s - %(message)s')  # Added type hint
 console_handler.setFormatter(formatter)
-logger.addHandler(console_handler)
 
 file_handler: RotatingFileHandler = RotatingFileHandler(
     log_file_path, maxBytes=5 * 1024 * 1024, backupCount=2)  # Added type hint
 file_handler.setFormatter(formatter)
-logger.addHandler(file_handler)
+
+# Route log records through an in-memory queue so emitting a record is a
+# plain queue.put; a background listener thread does the actual console
+# and (synchronous) disk writes off the event loop thread.
+log_queue: queue.SimpleQueue = queue.SimpleQueue()  # Added type hint
+queue_handler: QueueHandler = QueueHandler(log_queue)  # Added type hint
+logger.addHandler(queue_handler)
+
+log_listener: QueueListener = QueueListener(
+    log_queue, console_handler, file_handler,
+    respect_handler_level=True)  # Added type hint
+log_listener.start()
+atexit.register(log_listener.stop)
 
 # --- End Logging Configuration ---
 
-# Configuration from environment variables
-VAULT_ADDR: str = os.getenv(
-    'VAULT_ADDR', 'http://127.0.0.1:8200')  # Added type hint
-VAULT_SERVICE_TOKEN: Optional[str] = os.getenv(
-    'VAULT_SERVICE_TOKEN')  # Added type hint
+# Configuration from environment variables, parsed once at import into a
+# typed settings object instead of per-use os.getenv lookups.
+
+
+class Settings(BaseSettings):
+    """Application settings, read from the environment / .env file."""
+    vault_addr: str = "http://127.0.0.1:8200"
+    vault_service_token: Optional[str] = None
+    aws_region: str = "us-east-1"
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+
+@lru_cache
+def get_settings() -> Settings:
+    return Settings()
+
+
+settings: Settings = get_settings()  # Added type hint
+
 AWS_CREDS_VAULT_KV_PATH: str = "aws/credentials"  # Added type hint
 AWS_CREDS_VAULT_MOUNT: str = "secrets"  # Added type hint
-AWS_REGION: str = os.getenv('AWS_REGION', 'us-east-1')  # Added type hint
+
+# Constant prefix for suggested bucket names, bound once at import so the
+# hot name-generation endpoint only does timestamp + suffix + one f-string.
+BUCKET_NAME_PREFIX: str = "my-app-s3-kv2"  # Added type hint
 
 # Declare global variables for instances with Optional type hints
 vault_client_instance: Optional[VaultClient] = None
@@ -65,26 +99,28 @@ async def lifespan(app: FastAPI):
     logger.info("Application lifespan: Startup initiated.")
 
     try:
-        if not VAULT_SERVICE_TOKEN:
+        if not settings.vault_service_token:
             raise ValueError("VAULT_SERVICE_TOKEN environment variable is not set. Cannot start application.")
 
         # Initialize VaultClient
         vault_client_instance = VaultClient(
-            vault_addr=VAULT_ADDR,
-            vault_token=VAULT_SERVICE_TOKEN,
+            vault_addr=settings.vault_addr,
+            vault_token=settings.vault_service_token,
             vault_mount=AWS_CREDS_VAULT_MOUNT,
             vault_path=AWS_CREDS_VAULT_KV_PATH
         )
 
-        # Retrieve AWS credentials
+        # Retrieve AWS credentials. hvac is synchronous, so run the read in
+        # a worker thread to keep the event loop free during the Vault RPC.
         # Added type hint
-        aws_creds: Dict[str, str] = vault_client_instance.get_aws_credentials()
+        aws_creds: Dict[str, str] = await asyncio.to_thread(
+            vault_client_instance.get_aws_credentials)
 
         # Initialize S3Manager
         s3_manager_instance = S3Manager(
             aws_access_key_id=aws_creds['access_key'],
             aws_secret_access_key=aws_creds['secret_access_key'],
-            region_name=AWS_REGION,
+            region_name=settings.aws_region,
             aws_session_token=aws_creds.get(
                 'security_token') or aws_creds.get('session_token')
         )
@@ -92,17 +128,17 @@ async def lifespan(app: FastAPI):
             "VaultClient and S3Manager initialized successfully during startup.")
 
     except ValueError as e:
-        logger.critical(
-            f"FATAL: Failed to initialize application due to Vault/Credential issue: {e}")
+        logger.critical("FATAL: Failed to initialize application due to Vault/Credential issue: %s", e)
         raise RuntimeError(f"Application startup failed: {e}")
     except Exception as e:
-        logger.critical(
-            f"FATAL: An unexpected error occurred during application startup: {e}")
+        logger.critical("FATAL: An unexpected error occurred during application startup: %s", e)
         raise RuntimeError(f"Application startup failed: {e}")
 
     yield
 
     logger.info("Application lifespan: Shutting down.")
+    if s3_manager_instance is not None:
+        await s3_manager_instance.close()
     logger.info("Application lifespan: Shutdown complete.")
 
 # --- Initialize FastAPI app with lifespan ---
@@ -110,7 +146,9 @@ app = FastAPI(
     title="FastAPI: Vault & S3 Management (OOP)",
     description="A FastAPI application leveraging OOP to manage AWS S3 buckets "
                 "with credentials retrieved from HashiCorp Vault.",
-    lifespan=lifespan
+    lifespan=lifespan,
+    # orjson serializes responses several times faster than stdlib json
+    default_response_class=ORJSONResponse
 )
 
 
@@ -131,14 +169,15 @@ async def generate_unique_bucket_name_api():
     Generates a globally unique S3 bucket name suggestion based on timestamp and random string,
     ensuring it conforms to AWS S3 bucket naming rules (lowercase, no underscores).
     """
-    timestamp: str = datetime.datetime.now().strftime(
-        '%Y%m%d%H%M%S%f')[:-3]  # Added type hint
-    random_str: str = ''.join(random.choices(
-        'abcdefghijklmnopqrstuvwxyz0123456789', k=6))  # Added type hint
+    # Milliseconds since epoch in hex: a single C call, still monotonic
+    # per-process and S3-name-compliant, vs datetime + strftime machinery.
+    timestamp: str = f"{time.time_ns() // 1_000_000:x}"  # Added type hint
+    # One C-level call producing 6 lowercase hex chars, vs six Python-level
+    # random.choices dispatches; already S3-name-compliant.
+    random_str: str = secrets.token_hex(3)  # Added type hint
     # Added type hint
-    suggested_name: str = f"my-app-s3-kv2-{timestamp}-{random_str}".lower(
-    ).replace('_', '-')
-    logger.info(f"Generated unique bucket name suggestion: {suggested_name}")
+    suggested_name: str = f"{BUCKET_NAME_PREFIX}-{timestamp}-{random_str}"
+    logger.info("Generated unique bucket name suggestion: %s", suggested_name)
     return {"suggested_bucket_name": suggested_name}
 
 
@@ -150,15 +189,15 @@ async def create_s3_bucket_endpoint(
     """
     Creates a new S3 bucket using credentials managed by the S3Manager.
     """
-    logger.info(f"Received request to create S3 bucket: '{bucket_name}'")
+    logger.info("Received request to create S3 bucket: '%s'", bucket_name)
     if s3_manager_instance is None:  # Explicit check for None
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="S3 Manager not initialized.")
 
-    success: bool = s3_manager_instance.create_bucket(
+    success: bool = await s3_manager_instance.create_bucket(
         bucket_name)  # Added type hint
     if success:
-        return {"message": f"Bucket '{bucket_name}' creation initiated successfully in region '{AWS_REGION}'."}
+        return {"message": f"Bucket '{bucket_name}' creation initiated successfully in region '{settings.aws_region}'."}
     else:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail=f"Failed to create bucket '{bucket_name}'. Check logs for details.")
@@ -167,25 +206,28 @@ async def create_s3_bucket_endpoint(
 @app.get("/list-s3-buckets")
 async def list_s3_buckets_api():
     """
-    Lists all S3 buckets in the AWS account using credentials managed by the S3Manager.
+    Streams all S3 buckets in the AWS account as newline-delimited JSON,
+    one bucket object per line, using credentials managed by the S3Manager.
+
+    Streaming keeps memory at one ListBuckets page regardless of how many
+    buckets the account owns.
     """
     logger.info("Attempting to list S3 buckets.")
     if s3_manager_instance is None:  # Explicit check for None
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="S3 Manager not initialized.")
 
-    try:
-        # Added type hint
-        buckets: List[Dict[str, Any]] = s3_manager_instance.list_buckets()
-        return {"buckets": buckets}
-    except Exception as e:
-        logger.exception(
-            f"An unexpected error occurred during S3 bucket listing: {e}")
-        if isinstance(e, HTTPException):
-            raise e
-        else:
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                detail=f"An unexpected error occurred: {e}")
+    async def bucket_stream() -> AsyncIterator[bytes]:
+        try:
+            async for bucket in s3_manager_instance.iter_buckets():
+                yield orjson.dumps(bucket) + b"\n"
+        except Exception as e:
+            # Headers are already sent once streaming starts, so the best
+            # we can do is log and truncate the stream.
+            logger.exception("An unexpected error occurred during S3 bucket listing: %s", e)
+            raise
+
+    return StreamingResponse(bucket_stream(), media_type="application/x-ndjson")
 
 
 @app.delete("/delete-s3-bucket/{bucket_name}")
@@ -194,19 +236,18 @@ async def delete_s3_bucket_api(bucket_name: str):
     Deletes an S3 bucket after emptying it, using credentials managed by the S3Manager.
     Note: Deleting a bucket is a destructive operation and cannot be undone.
     """
-    logger.info(f"Received request to delete S3 bucket: '{bucket_name}'")
+    logger.info("Received request to delete S3 bucket: '%s'", bucket_name)
     if s3_manager_instance is None:  # Explicit check for None
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="S3 Manager not initialized.")
 
     try:
-        s3_manager_instance.delete_bucket(bucket_name)
+        await s3_manager_instance.delete_bucket(bucket_name)
         return {"message": f"S3 bucket '{bucket_name}' deleted successfully."}
-    except HTTPException as e:
-        raise e
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.exception(
-            f"An unexpected error occurred during S3 bucket deletion: {e}")
+        logger.exception("An unexpected error occurred during S3 bucket deletion: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail=f"An unexpected error occurred: {e}")
 
@@ -215,16 +256,19 @@ async def delete_s3_bucket_api(bucket_name: str):
 if __name__ == "__main__":
     import uvicorn
     logger.info("Starting FastAPI application via uvicorn...")
-    logger.info(f"Vault Address (from ENV): {VAULT_ADDR}")
-    logger.info(
-        f"Vault Service Token (from ENV): {'Set' if VAULT_SERVICE_TOKEN else 'NOT SET - Vault/AWS operations will fail!'}")
-    logger.info(f"Vault KV Mount: {AWS_CREDS_VAULT_MOUNT}")
-    logger.info(f"Vault KV Path: {AWS_CREDS_VAULT_KV_PATH}")
-    logger.info(f"AWS Region (from ENV): {AWS_REGION}")
-    logger.info(f"Logs will be written to: {log_file_path}")
-
-    if not VAULT_SERVICE_TOKEN:
+    logger.info("Vault Address (from ENV): %s", settings.vault_addr)
+    logger.info("Vault Service Token (from ENV): %s", 'Set' if settings.vault_service_token else 'NOT SET - Vault/AWS operations will fail!')
+    logger.info("Vault KV Mount: %s", AWS_CREDS_VAULT_MOUNT)
+    logger.info("Vault KV Path: %s", AWS_CREDS_VAULT_KV_PATH)
+    logger.info("AWS Region (from ENV): %s", settings.aws_region)
+    logger.info("Logs will be written to: %s", log_file_path)
+
+    if not settings.vault_service_token:
         logger.critical(
             "\n!!! WARNING: VAULT_SERVICE_TOKEN environment variable is NOT SET. Vault and AWS S3 operations will fail! !!!\n")
 
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # uvloop's libuv event loop and httptools' C HTTP/1.1 parser (both
+    # shipped by uvicorn[standard]) cut per-request I/O latency vs the
+    # stdlib selector loop and pure-Python h11.
+    uvicorn.run(app, host="0.0.0.0", port=8000,
+                loop="uvloop", http="httptools")
@@ -1,196 +1,340 @@
 # s3_manager.py
-import boto3
+import aioboto3
+import asyncio
 import logging
 from botocore.client import BaseClient
+from botocore.config import Config
 from botocore.exceptions import ClientError
-from typing import Dict, List, Any, Optional
+from typing import AsyncIterator, Dict, List, Any, Optional, Tuple
 from fastapi import HTTPException, status
 
 logger = logging.getLogger(__name__)
 
+# Shared client configuration: the default urllib3/aiohttp pool of 10
+# connections throttles concurrent endpoints, so raise it and keep TCP
+# connections alive to amortize TLS handshakes across calls.
+# delete_objects caps each request at 1000 keys
+_DELETE_BATCH_SIZE = 1000
+
+# Cap on in-flight delete batches during a fan-out: enough to keep the
+# wire busy without oversubscribing the shared client's connection pool
+# or starving other endpoints of connections.
+_MAX_CONCURRENT_DELETES = 16
+
+_CLIENT_CONFIG = Config(
+    max_pool_connections=50,
+    retries={'max_attempts': 5, 'mode': 'adaptive'},
+    tcp_keepalive=True,
+)
+
+
+# Dispatch tables for ClientError codes: one dict lookup replaces the
+# chained elif ladders, with identical semantics. Message templates are
+# %-formatted with a {'bucket': ..., 'region': ...} mapping.
+
+# create_bucket: code -> (result, log level, message template or None)
+_CREATE_BUCKET_ERROR_HANDLERS: Dict[str, Tuple[bool, int, Optional[str]]] = {
+    'BucketAlreadyOwnedByYou': (
+        True, logging.WARNING,
+        "Bucket '%(bucket)s' already exists and is owned by you. Considering it successful."),
+    'BucketAlreadyExists': (
+        False, logging.ERROR,
+        "Bucket '%(bucket)s' already exists and is owned by another account. Cannot create."),
+    'AccessDenied': (
+        False, logging.ERROR,
+        "Access Denied: The provided AWS credentials do not have permission to create buckets in '%(region)s'."),
+    'InvalidAccessKeyId': (
+        False, logging.ERROR,
+        "Invalid AWS credentials. Check the credentials provided to S3Manager."),
+    'SignatureDoesNotMatch': (
+        False, logging.ERROR,
+        "Invalid AWS credentials. Check the credentials provided to S3Manager."),
+}
+
+# delete_bucket: code -> (HTTP status, detail template)
+_DELETE_BUCKET_HTTP_ERRORS: Dict[str, Tuple[int, str]] = {
+    'NoSuchBucket': (
+        status.HTTP_404_NOT_FOUND,
+        "Bucket '%(bucket)s' not found."),
+    'AccessDenied': (
+        status.HTTP_403_FORBIDDEN,
+        "Access denied to delete bucket '%(bucket)s'. Check AWS permissions."),
+    'BucketNotEmpty': (
+        status.HTTP_409_CONFLICT,
+        "Bucket '%(bucket)s' is not empty after emptying attempt. Manual verification needed."),
+}
+
+
+def _isoformat_list_buckets(parsed: Dict[str, Any], **kwargs: Any) -> None:
+    """
+    after-call hook for ListBuckets: rewrites each bucket's CreationDate
+    datetime as an ISO-8601 string at the parse boundary, so callers get
+    response-ready dicts without a per-bucket datetime round-trip.
+    """
+    buckets = parsed.get('Buckets')
+    if buckets:
+        parsed['Buckets'] = [
+            {
+                'Name': bucket.get('Name'),
+                'CreationDate': bucket['CreationDate'].isoformat() if bucket.get('CreationDate') else None
+            }
+            for bucket in buckets
+        ]
+
 
 class S3Manager:
     """
     Manages AWS S3 bucket operations (create, list, delete, empty).
+
+    All operations are async: every method shares one long-lived aioboto3
+    S3 client so awaited AWS calls yield the event loop during network I/O
+    instead of blocking it, while connection setup is paid only once.
     """
     # Define instance variables with type hints
     region_name: str
-    _s3_client: BaseClient
+    _s3_session: aioboto3.Session
+    _s3_client_cm: Optional[Any]
+    _s3_client: Optional[BaseClient]
 
     def __init__(self, aws_access_key_id: str, aws_secret_access_key: str, region_name: str, aws_session_token: Optional[str] = None):
         self.region_name = region_name
-        self._s3_client = self._initialize_s3_client(
+        self._s3_session = self._initialize_s3_session(
             aws_access_key_id, aws_secret_access_key, aws_session_token)
+        # Lazily-entered long-lived client shared by all requests.
+        self._s3_client_cm = None
+        self._s3_client = None
 
-    def _initialize_s3_client(self, access_key: str, secret_key: str, session_token: Optional[str] = None) -> BaseClient:
-        """Initializes and returns an S3 client."""
-        s3_client_kwargs: Dict[str, Any] = {  # Added type hint for s3_client_kwargs
+    def _initialize_s3_session(self, access_key: str, secret_key: str, session_token: Optional[str] = None) -> aioboto3.Session:
+        """
+        Initializes and returns an aioboto3 session shared by all S3 calls.
+
+        Note: requirements.txt pins botocore[crt]; when awscrt is present
+        botocore auto-selects the C-implemented SigV4 signer, taking the
+        per-request HMAC key derivation off the pure-Python path. Don't
+        drop that extra when touching dependencies.
+        """
+        session_kwargs: Dict[str, Any] = {  # Added type hint for session_kwargs
             'aws_access_key_id': access_key,
             'aws_secret_access_key': secret_key,
             'region_name': self.region_name
         }
         if session_token:
-            s3_client_kwargs['aws_session_token'] = session_token
+            session_kwargs['aws_session_token'] = session_token
             logger.info(
-                "Initializing S3 client with temporary STS credentials.")
+                "Initializing S3 session with temporary STS credentials.")
         else:
-            logger.info("Initializing S3 client with static AWS credentials.")
+            logger.info("Initializing S3 session with static AWS credentials.")
 
-        return boto3.client('s3', **s3_client_kwargs)
+        return aioboto3.Session(**session_kwargs)
 
-    def create_bucket(self, bucket_name: str) -> bool:
+    async def _get_client(self) -> BaseClient:
+        """
+        Returns the shared long-lived S3 client, entering its context on
+        first use. Reusing one client across all coroutines avoids per-call
+        client construction and lets the enlarged connection pool do its job.
+        """
+        if self._s3_client is None:
+            self._s3_client_cm = self._s3_session.client(
+                's3', region_name=self.region_name, config=_CLIENT_CONFIG)
+            self._s3_client = await self._s3_client_cm.__aenter__()
+            self._s3_client.meta.events.register(
+                'after-call.s3.ListBuckets', _isoformat_list_buckets)
+        return self._s3_client
+
+    async def close(self) -> None:
+        """Closes the shared S3 client. Called on application shutdown."""
+        if self._s3_client_cm is not None:
+            await self._s3_client_cm.__aexit__(None, None, None)
+            self._s3_client_cm = None
+            self._s3_client = None
+
+    async def create_bucket(self, bucket_name: str) -> bool:
         """
         Creates an S3 bucket with the specified name in the given region.
         """
-        logger.info(
-            f"Attempting to create S3 bucket: '{bucket_name}' in region: '{self.region_name}'")
+        logger.info("Attempting to create S3 bucket: '%s' in region: '%s'", bucket_name, self.region_name)
         try:
+            s3 = await self._get_client()
             if self.region_name == 'us-east-1':
-                self._s3_client.create_bucket(Bucket=bucket_name)
+                await s3.create_bucket(Bucket=bucket_name)
             else:
-                self._s3_client.create_bucket(
+                await s3.create_bucket(
                     Bucket=bucket_name,
                     CreateBucketConfiguration={
                         'LocationConstraint': self.region_name}
                 )
-            logger.info(f"S3 bucket '{bucket_name}' created successfully.")
+            logger.info("S3 bucket '%s' created successfully.", bucket_name)
             return True
         except ClientError as e:
-            error_code: str = e.response.get(
-                "Error", {}).get("Code")  # Added type hint
-            error_message: str = e.response.get(
-                "Error", {}).get("Message")  # Added type hint
-            logger.error(
-                f"Failed to create S3 bucket '{bucket_name}'. AWS ClientError: Code={error_code}, Message={error_message}", exc_info=True)
-            if error_code == 'BucketAlreadyOwnedByYou':
-                logger.warning(
-                    f"Bucket '{bucket_name}' already exists and is owned by you. Considering it successful.")
-                return True
-            elif error_code == 'BucketAlreadyExists':
-                logger.error(
-                    f"Bucket '{bucket_name}' already exists and is owned by another account. Cannot create.")
-                return False
-            elif error_code == 'AccessDenied':
-                logger.error(
-                    f"Access Denied: The provided AWS credentials do not have permission to create buckets in '{self.region_name}'.")
-                return False
-            elif error_code == 'InvalidAccessKeyId' or error_code == 'SignatureDoesNotMatch':
-                logger.error(
-                    f"Invalid AWS credentials. Check the credentials provided to S3Manager.")
-                return False
-            else:
-                return False
+            error: Dict[str, str] = e.response.get(
+                "Error") or {}  # Added type hint
+            error_code: str = error.get("Code")  # Added type hint
+            error_message: str = error.get("Message")  # Added type hint
+            logger.error("Failed to create S3 bucket '%s'. AWS ClientError: Code=%s, Message=%s",
+                         bucket_name, error_code, error_message, exc_info=True)
+            success, level, template = _CREATE_BUCKET_ERROR_HANDLERS.get(
+                error_code, (False, logging.ERROR, None))
+            if template:
+                logger.log(level, template, {
+                    'bucket': bucket_name, 'region': self.region_name})
+            return success
         except Exception as e:
-            logger.exception(
-                f"An unexpected error occurred while creating S3 bucket '{bucket_name}': {e}")
+            logger.exception("An unexpected error occurred while creating S3 bucket '%s': %s", bucket_name, e)
             return False
 
-    def list_buckets(self) -> List[Dict[str, Any]]:
+    async def bucket_exists(self, bucket_name: str) -> bool:
+        """
+        Checks whether an S3 bucket exists via a single head_bucket call.
+
+        Prefer this over scanning list_buckets(): head_bucket is O(1)
+        regardless of how many buckets the account owns.
+        """
+        logger.info("Checking existence of S3 bucket: '%s'", bucket_name)
+        s3 = await self._get_client()
+        try:
+            await s3.head_bucket(Bucket=bucket_name)
+            return True
+        except ClientError as e:
+            error_code: str = (e.response.get("Error")
+                               or {}).get("Code")  # Added type hint
+            if error_code in ('404', 'NoSuchBucket'):
+                return False
+            raise
+
+    async def list_buckets(self) -> List[Dict[str, Any]]:
         """
         Lists all S3 buckets in the AWS account.
         """
         logger.info("Attempting to list S3 buckets.")
+        s3 = await self._get_client()
         # Added type hint
-        response: Dict[str, Any] = self._s3_client.list_buckets()
+        response: Dict[str, Any] = await s3.list_buckets()
 
-        buckets_list: List[Dict[str, Any]] = []  # Added type hint
-        for bucket in response.get('Buckets', []):
-            buckets_list.append({
-                "Name": bucket.get('Name'),
-                "CreationDate": bucket.get('CreationDate').isoformat() if bucket.get('CreationDate') else None
-            })
+        # The after-call hook already formatted each bucket dict.
+        buckets_list: List[Dict[str, Any]] = response.get(
+            'Buckets', [])  # Added type hint
 
-        logger.info(f"Successfully listed {len(buckets_list)} S3 buckets.")
+        logger.info("Successfully listed %s S3 buckets.", len(buckets_list))
         return buckets_list
 
-    def empty_bucket(self, bucket_name: str) -> None:
+    async def iter_buckets(self) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yields buckets one at a time via the ListBuckets paginator.
+
+        Unlike list_buckets(), memory stays O(page_size) rather than
+        O(total_buckets), which matters for accounts with thousands of
+        buckets when the caller streams the response.
+        """
+        logger.info("Streaming S3 bucket listing.")
+        s3 = await self._get_client()
+        paginator = s3.get_paginator('list_buckets')
+        async for page in paginator.paginate():
+            # Each page's bucket dicts are already formatted by the
+            # after-call hook.
+            for bucket in page.get('Buckets', []):
+                yield bucket
+
+    async def empty_bucket(self, bucket_name: str) -> None:
         """
         Deletes all objects and object versions from an S3 bucket.
         Required before deleting the bucket itself.
+
+        Uses paginators so buckets with more than 1000 items are fully
+        emptied, and deletes each page concurrently so total latency is
+        bounded by the slowest page rather than the sum of all pages.
         """
-        logger.info(f"Attempting to empty S3 bucket: '{bucket_name}'")
+        logger.info("Attempting to empty S3 bucket: '%s'", bucket_name)
         try:
-            # List all objects
-            objects: Dict[str, Any] = self._s3_client.list_objects_v2(
-                Bucket=bucket_name)  # Added type hint
-            if 'Contents' in objects:
+            s3 = await self._get_client()
+            delete_tasks: List[asyncio.Task] = []  # Added type hint
+            delete_semaphore: asyncio.Semaphore = asyncio.Semaphore(
+                _MAX_CONCURRENT_DELETES)  # Added type hint
+
+            async def _delete_batch(batch: List[Dict[str, str]]) -> int:
+                async with delete_semaphore:
+                    # Quiet mode: S3 only reports failures, halving the
+                    # response body parsed per batch. CRC32 is cheaper to
+                    # compute than the MD5 fallback for the payload hash.
+                    await s3.delete_objects(
+                        Bucket=bucket_name,
+                        Delete={'Objects': batch, 'Quiet': True},
+                        ChecksumAlgorithm='CRC32')
+                return len(batch)
+
+            def _submit_batches(items: List[Dict[str, str]]) -> None:
+                # delete_objects accepts at most 1000 keys per request.
+                for i in range(0, len(items), _DELETE_BATCH_SIZE):
+                    delete_tasks.append(asyncio.ensure_future(
+                        _delete_batch(items[i:i + _DELETE_BATCH_SIZE])))
+
+            # Delete all objects, one concurrent delete per 1000-key batch
+            objects_paginator = s3.get_paginator('list_objects_v2')
+            async for page in objects_paginator.paginate(Bucket=bucket_name):
                 delete_keys: List[Dict[str, str]] = [
                     # Added type hint
-                    {'Key': obj['Key']} for obj in objects['Contents']]
-                self._s3_client.delete_objects(Bucket=bucket_name, Delete={
-                                               'Objects': delete_keys})
-                logger.info(
-                    f"Deleted {len(delete_keys)} objects from '{bucket_name}'.")
-
-            # List all object versions (for versioned buckets)
-            versions: Dict[str, Any] = self._s3_client.list_object_versions(
-                Bucket=bucket_name)  # Added type hint
-            if 'Versions' in versions:
+                    {'Key': obj['Key']} for obj in page.get('Contents', [])]
+                _submit_batches(delete_keys)
+
+            # Delete all object versions and delete markers (for versioned
+            # buckets), coalesced into shared full-size batches
+            versions_paginator = s3.get_paginator('list_object_versions')
+            async for page in versions_paginator.paginate(Bucket=bucket_name):
                 delete_versions: List[Dict[str, str]] = [
                     # Added type hint
-                    {'Key': v['Key'], 'VersionId': v['VersionId']} for v in versions['Versions']]
-                self._s3_client.delete_objects(Bucket=bucket_name, Delete={
-                                               'Objects': delete_versions})
-                logger.info(
-                    f"Deleted {len(delete_versions)} versions from '{bucket_name}'.")
-
-            if 'DeleteMarkers' in versions:
-                delete_markers: List[Dict[str, str]] = [
-                    # Added type hint
-                    {'Key': dm['Key'], 'VersionId': dm['VersionId']} for dm in versions['DeleteMarkers']]
-                self._s3_client.delete_objects(Bucket=bucket_name, Delete={
-                                               'Objects': delete_markers})
-                logger.info(
-                    f"Deleted {len(delete_markers)} delete markers from '{bucket_name}'.")
+                    {'Key': v['Key'], 'VersionId': v['VersionId']}
+                    for v in page.get('Versions', []) + page.get('DeleteMarkers', [])]
+                _submit_batches(delete_versions)
+
+            if delete_tasks:
+                deleted_counts: List[int] = await asyncio.gather(*delete_tasks)
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("Deleted %s objects/versions from '%s' across %s batches.",
+                                sum(deleted_counts), bucket_name, len(delete_tasks))
 
-            logger.info(f"S3 bucket '{bucket_name}' successfully emptied.")
+            logger.info("S3 bucket '%s' successfully emptied.", bucket_name)
 
         except ClientError as e:
-            error_code: str = e.response.get("Error", {}).get("Code")
-            error_message: str = e.response.get("Error", {}).get("Message")
-            logger.error(
-                f"AWS ClientError while emptying bucket '{bucket_name}': Code={error_code}, Message={error_message}"
-            )
+            error: Dict[str, str] = e.response.get("Error") or {}
+            error_code: str = error.get("Code")
+            error_message: str = error.get("Message")
+            logger.error("AWS ClientError while emptying bucket '%s': Code=%s, Message=%s",
+                         bucket_name, error_code, error_message)
             raise e
         except Exception as e:
-            logger.exception(
-                f"An unexpected error occurred while emptying bucket '{bucket_name}': {e}")
+            logger.exception("An unexpected error occurred while emptying bucket '%s': %s", bucket_name, e)
             raise e
 
-    def delete_bucket(self, bucket_name: str) -> None:
+    async def delete_bucket(self, bucket_name: str) -> None:
         """
         Deletes an S3 bucket after emptying it.
         Raises HTTPException if the bucket cannot be deleted.
         """
-        logger.info(f"Attempting to delete S3 bucket: '{bucket_name}'")
+        logger.info("Attempting to delete S3 bucket: '%s'", bucket_name)
 
         try:
             # First, empty the bucket
-            self.empty_bucket(bucket_name)
+            await self.empty_bucket(bucket_name)
 
             # Then, delete the bucket
-            self._s3_client.delete_bucket(Bucket=bucket_name)
-            logger.info(f"S3 bucket '{bucket_name}' successfully deleted.")
+            s3 = await self._get_client()
+            await s3.delete_bucket(Bucket=bucket_name)
+            logger.info("S3 bucket '%s' successfully deleted.", bucket_name)
         except ClientError as e:
-            error_code: str = e.response.get("Error", {}).get("Code")
-            error_message: str = e.response.get("Error", {}).get("Message")
-            logger.error(
-                f"AWS ClientError occurred during S3 bucket deletion: Code={error_code}, Message={error_message}"
-            )
-            if error_code == 'NoSuchBucket':
+            error: Dict[str, str] = e.response.get("Error") or {}
+            error_code: str = error.get("Code")
+            error_message: str = error.get("Message")
+            logger.error("AWS ClientError occurred during S3 bucket deletion: Code=%s, Message=%s",
+                         error_code, error_message)
+            http_error: Optional[Tuple[int, str]] = _DELETE_BUCKET_HTTP_ERRORS.get(
+                error_code)  # Added type hint
+            if http_error is not None:
+                status_code, detail_template = http_error
                 raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND, detail=f"Bucket '{bucket_name}' not found.")
-            elif error_code == 'AccessDenied':
-                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
-                                    detail=f"Access denied to delete bucket '{bucket_name}'. Check AWS permissions.")
-            elif error_code == 'BucketNotEmpty':
-                raise HTTPException(status_code=status.HTTP_409_CONFLICT,
-                                    detail=f"Bucket '{bucket_name}' is not empty after emptying attempt. Manual verification needed.")
-            else:
-                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                    detail=f"AWS ClientError during deletion: Code={error_code}, Message={error_message}")
+                    status_code=status_code,
+                    detail=detail_template % {'bucket': bucket_name})
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail=f"AWS ClientError during deletion: Code={error_code}, Message={error_message}")
         except Exception as e:
-            logger.exception(
-                f"An unexpected error occurred during S3 bucket deletion: {e}")
+            logger.exception("An unexpected error occurred during S3 bucket deletion: %s", e)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                                 detail=f"An unexpected error occurred: {e}")
@@ -2,11 +2,17 @@
 import os
 import hvac
 import logging
+from cachetools import TTLCache
 # Import Optional for attributes that might be None initially
-from typing import Dict, Union, Optional
+from typing import Dict, Tuple, Union, Optional
 
 logger = logging.getLogger(__name__)
 
+# Credentials cache shared across VaultClient instances, keyed on
+# (mount, path). The 5-minute TTL keeps repeated lookups from hitting
+# Vault while staying well inside typical token lifetimes.
+_credentials_cache: TTLCache = TTLCache(maxsize=8, ttl=300)
+
 
 class VaultClient:
     """
@@ -18,12 +24,15 @@ class VaultClient:
     vault_mount: str
     vault_path: str
     _client: hvac.Client  # Internal HVAC client instance
+    # None until the first secret read proves the token valid (or not)
+    _authenticated: Optional[bool]
 
     def __init__(self, vault_addr: str, vault_token: str, vault_mount: str, vault_path: str):
         self.vault_addr = vault_addr
         self.vault_token = vault_token
         self.vault_mount = vault_mount
         self.vault_path = vault_path
+        self._authenticated = None
         # Initialize _client during instantiation
         self._client = self._initialize_client()
 
@@ -34,22 +43,29 @@ class VaultClient:
                 "VAULT_SERVICE_TOKEN is not set. Cannot initialize Vault client.")
             raise ValueError("VAULT_SERVICE_TOKEN must be provided.")
 
+        # No is_authenticated() probe here: that issues an extra
+        # lookup-self round-trip per construction. Token validity is
+        # detected lazily on the first real secret read instead.
         client = hvac.Client(url=self.vault_addr, token=self.vault_token)
-        if not client.is_authenticated():
-            logger.error(
-                "Failed to authenticate to Vault. Check VAULT_SERVICE_TOKEN validity/expiration.")
-            raise hvac.exceptions.VaultError(
-                "Failed to authenticate to Vault with service token.")
-
-        logger.info("Successfully initialized and authenticated HVAC client.")
+        logger.info("Successfully initialized HVAC client.")
         return client
 
     def get_aws_credentials(self) -> Dict[str, str]:
         """
         Retrieves AWS credentials from the configured Vault KV path.
+
+        Results are cached for 5 minutes per (mount, path) so repeated
+        lookups do not each cost a Vault round-trip.
         """
-        logger.info(
-            f"Attempting to retrieve AWS credentials from Vault path: {self.vault_mount}/data/{self.vault_path}")
+        cache_key: Tuple[str, str] = (
+            self.vault_mount, self.vault_path)  # Added type hint
+        cached_credentials: Optional[Dict[str, str]
+                                     ] = _credentials_cache.get(cache_key)
+        if cached_credentials is not None:
+            logger.info("Returning cached AWS credentials for Vault path: %s/%s", self.vault_mount, self.vault_path)
+            return cached_credentials
+
+        logger.info("Attempting to retrieve AWS credentials from Vault path: %s/data/%s", self.vault_mount, self.vault_path)
 
         try:
             read_response: Dict[str, Any] = self._client.secrets.kv.v2.read_secret_version(  # Added type hint for read_response
@@ -66,18 +82,28 @@ class VaultClient:
                     raise ValueError(
                         "Incomplete AWS credentials retrieved from Vault.")
 
-                logger.info(
-                    f"Successfully retrieved AWS credentials from Vault path: {self.vault_mount}/{self.vault_path}")
+                logger.info("Successfully retrieved AWS credentials from Vault path: %s/%s", self.vault_mount, self.vault_path)
+                self._authenticated = True
+                _credentials_cache[cache_key] = credentials
                 return credentials
             else:
-                logger.error(
-                    f"No data found at Vault path: {self.vault_mount}/data/{self.vault_path} or secret structure is unexpected.")
+                logger.error("No data found at Vault path: %s/data/%s or secret structure is unexpected.", self.vault_mount, self.vault_path)
                 raise ValueError(
                     f"Failed to retrieve data from Vault path: {self.vault_mount}/data/{self.vault_path}")
 
+        except (hvac.exceptions.Forbidden, hvac.exceptions.Unauthorized) as e:
+            # Lazy auth detection: the first secret read doubles as the
+            # authentication check previously done by is_authenticated().
+            self._authenticated = False
+            _credentials_cache.pop(cache_key, None)
+            logger.exception("Vault rejected the service token during credential retrieval: %s", e)
+            raise ValueError(
+                "Failed to authenticate to Vault with service token. "
+                "Check VAULT_SERVICE_TOKEN validity/expiration and its 'read' "
+                f"capabilities on '{self.vault_mount}/data/{self.vault_path}'.")
         except hvac.exceptions.VaultError as e:
-            logger.exception(
-                f"Vault error occurred during credential retrieval: {e}")
+            _credentials_cache.pop(cache_key, None)
+            logger.exception("Vault error occurred during credential retrieval: %s", e)
             # Added type hint for error_detail
             error_detail: str = f"Vault error: {e}"
             if "forbidden" in str(e).lower():
@@ -90,6 +116,6 @@ class VaultClient:
                 error_detail = f"Vault path '{self.vault_mount}/data/{self.vault_path}' not found. Check the path and mount point."
             raise ValueError(error_detail)
         except Exception as e:
-            logger.exception(
-                f"An unexpected error occurred while reading from Vault: {e}")
+            _credentials_cache.pop(cache_key, None)
+            logger.exception("An unexpected error occurred while reading from Vault: %s", e)
             raise ValueError(f"Internal error while fetching from Vault: {e}")